@@ -4,8 +4,7 @@ import sys
 import argparse
 import sqlalchemy.exc
 
-import gmalthgtparser as hgt
-
+import gmaltcli.hgt as hgt
 import gmaltcli.tools as tools
 import gmaltcli.worker as worker
 import gmaltcli.database as database
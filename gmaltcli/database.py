@@ -150,6 +150,21 @@ class BaseManager(object):
         with self.connection.begin():
             return self._execute(self.connection, query, params=params, method=method)
 
+    def execute_many(self, query, params_seq):
+        """ Execute the SQL `query` once per dict of `params_seq` inside a single transaction
+
+        .. note:: the query and the whole sequence of params are sent to the
+            database driver in one executemany call so the round trip and
+            planning costs are amortized over the batch
+
+        :param str query: the SQL query to execute
+        :param params_seq: list of dicts of values to bind to the query
+        """
+        if not params_seq:
+            return
+        with self.connection.begin():
+            self.connection.execute(query.format(table_name=self.table_name), params_seq)
+
     def table_exists(self):
         """ Execute the `TABLE_EXISTS_QUERY` query
 
@@ -198,7 +213,7 @@ class BaseManager(object):
         :param data: elevation data (polygon, elevation)
         :type data: tuple
         :param parser: the HGT parser
-        :type parser: :class:`gmalthgtparser.HgtParser`
+        :type parser: :class:`gmaltcli.hgt.HgtParser`
         :return: dict with the params for both queries
         :rtype: dict
         """
@@ -207,12 +222,12 @@ class BaseManager(object):
     def insert_data(self, data, parser):
         """ Insert elevation data if they don't exist in the table yet
 
-        :param data: data coming from a HGT iterator (:class:`gmalthgtparser.HgtSampleIterator`
-            or :class:`gmalthgtparser.HgtValueIterator`)
+        :param data: data coming from a HGT iterator (:class:`gmaltcli.hgt.HgtSampleIterator`
+            or :class:`gmaltcli.hgt.HgtValueIterator`)
         :type data: tuple
         :param parser: the HGT parser used to get the data. Passed in this method because some database manager needs
             generic information about the parsed file that are stored in the parser
-        :rtype: :class:`gmalthgtparser.HgtParser`
+        :rtype: :class:`gmaltcli.hgt.HgtParser`
         """
         # Don't import void elevation values
         elevation_value = data[4]
@@ -224,6 +239,21 @@ class BaseManager(object):
         if not value_exists:
             self.execute(self.VALUE_CREATE_QUERY, params, method='scalar')
 
+    def insert_many(self, batch, parser):
+        """ Insert a batch of elevation data
+
+        .. note:: default implementation falls back on one `insert_data` call
+            per item. Override in child class when the database supports a
+            real batched INSERT
+
+        :param batch: list of data coming from a HGT iterator
+        :type batch: list of tuple
+        :param parser: the HGT parser used to get the data
+        :type parser: :class:`gmaltcli.hgt.HgtParser`
+        """
+        for data in batch:
+            self.insert_data(data, parser)
+
 
 class PostgresValueManager(with_metaclass(ManagerRegistry, BaseManager)):
     """ Provides SQL queries to import elevation value in a PostgreSQL table WITHOUT PostGIS """
@@ -255,6 +285,19 @@ class PostgresValueManager(with_metaclass(ManagerRegistry, BaseManager)):
     VALUE_CREATE_QUERY = ("INSERT INTO \"{table_name}\" (lat_min, lng_min, lat_max, lng_max, \"value\") "
                           "VALUES (%(lat_min)s, %(lng_min)s, %(lat_max)s, %(lng_max)s, %(value)s)")
 
+    # the primary key provides the same already-imported protection as the
+    # per row VALUE_EXIST_QUERY select of insert_data
+    VALUE_CREATE_MANY_QUERY = VALUE_CREATE_QUERY + " ON CONFLICT DO NOTHING"
+
+    def insert_many(self, batch, parser):
+        """ Insert a batch of elevation values with a single executemany INSERT
+
+        .. seealso:: :func:`gmaltcli.database.BaseManager.insert_many`
+        """
+        params_seq = [self.prepare_params(data, parser)
+                      for data in batch if data[4] != parser.VOID_VALUE]
+        self.execute_many(self.VALUE_CREATE_MANY_QUERY, params_seq)
+
     def prepare_params(self, data, parser):
         """
         .. seealso:: :func:`gmaltcli.database.BaseManager.prepare_params`
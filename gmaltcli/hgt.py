@@ -0,0 +1,578 @@
+# -*- coding: utf-8 -*-
+
+""" Provide classes to parse HGT file or iterate over the values in these files """
+
+import os
+import re
+import math
+import mmap
+import fractions
+import threading
+import collections
+
+import numpy as np
+
+#: extract the latitude and longitude orders and degrees from a HGT file name
+_FILENAME_RE = re.compile(r'^([NS])(\d+)([WE])(\d+)')
+
+
+class _GridCache(object):
+    """ A thread-safe LRU cache of decoded HGT value grids keyed by file path
+
+    .. note:: entries own a copy of the file values so cached parsers do not
+        keep any file handle or mapping open
+
+    :param int maxsize: maximum number of grids kept in the cache
+    """
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.lock = threading.RLock()
+        self.entries = collections.OrderedDict()
+
+    def get(self, filepath):
+        """ Get a cached grid and mark it as most recently used
+
+        :param str filepath: the path of the HGT file
+        :return: the cached value array or None
+        """
+        with self.lock:
+            if filepath not in self.entries:
+                return None
+            data = self.entries.pop(filepath)
+            self.entries[filepath] = data
+            return data
+
+    def put(self, filepath, data):
+        """ Store a grid and evict the least recently used ones above `maxsize`
+
+        :param str filepath: the path of the HGT file
+        :param data: the value array to cache
+        """
+        with self.lock:
+            self.entries.pop(filepath, None)
+            self.entries[filepath] = data
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """ Drop all the cached grids """
+        with self.lock:
+            self.entries.clear()
+
+
+#: shared cache used by parsers created with `use_cache=True`
+grid_cache = _GridCache()
+
+
+class HgtParser(object):
+    """ A tool to parse a HGT file
+
+    It is intended to be used in a context manager::
+
+        with HgtParser('myhgtfile.hgt') as parser:
+            parser.get_elevation((lat, lng))
+
+    :param str filepath: the path to the HGT file to parse
+    :param int width: provide the number of columns if not standard HGT squared file
+    :param int width: provide the number of lines if not standard HGT squared file
+    :param bool use_cache: if True keep the decoded values in the shared
+        `grid_cache` so parsing the same tile again skips the file entirely
+    """
+
+    VOID_VALUE = -32768
+
+    def __init__(self, filepath, width=None, height=None, use_cache=False):
+        if not os.path.exists(filepath):
+            raise Exception('file {} not found'.format(filepath))
+
+        self.file = None
+        self.mmap = None
+        self.data = None
+        self.grid = None
+        self._native = None
+        self.use_cache = use_cache
+        self.filepath = filepath
+        self.filename = os.path.basename(filepath)
+        sample = int(math.sqrt(os.path.getsize(filepath) / 2))
+
+        self.sample_lat = height or sample
+        self.sample_lng = width or sample
+
+        # the width (length on the longitude axis) of a square providing one elevation value
+        self.square_width = fractions.Fraction(1, self.sample_lng - 1)
+
+        # the height (length on the latitude axis) of a square providing one elevation value
+        self.square_height = fractions.Fraction(1, self.sample_lat - 1)
+
+        # the total width of the HGT file
+        self.area_width = 1 + self.square_width
+
+        # the total height of the HGT file
+        self.area_height = 1 + self.square_height
+
+        self.bottom_left_center = self._get_bottom_left_center(self.filename)
+        self.corners = self._get_corners_from_filename(self.bottom_left_center)
+        self.top_left_square = self._get_top_left_square()
+
+        # float lattices of the corner positions of every square in the file :
+        # latitude of each of the 4 corners per line and longitude of each of
+        # the 4 corners per column (see shift_first_square and get_all_squares)
+        self._corner_lats = np.array([float(corner[0]) for corner in self.top_left_square])[:, np.newaxis] \
+            - np.arange(self.sample_lat)[np.newaxis, :] * float(self.square_height)
+        self._corner_lngs = np.array([float(corner[1]) for corner in self.top_left_square])[:, np.newaxis] \
+            + np.arange(self.sample_lng)[np.newaxis, :] * float(self.square_width)
+
+    def __enter__(self):
+        if self.use_cache:
+            self.data = grid_cache.get(self.filepath)
+            if self.data is None:
+                # decode once into an owned read-only copy so the cached
+                # grid does not pin a file descriptor or a mapping
+                with open(self.filepath, 'rb') as hgt_file:
+                    self.data = np.frombuffer(hgt_file.read(), dtype='>i2').astype(np.int16)
+                self.data.setflags(write=False)
+                grid_cache.put(self.filepath, self.data)
+        else:
+            self.file = open(self.filepath, 'rb')
+            # Map the file and expose it as a big-endian int16 array. The mapping
+            # is zero-copy : values are read straight from the page cache and the
+            # kernel handles readahead when iterating over the whole file.
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self.mmap, 'madvise'):  # python >= 3.8
+                self.mmap.madvise(mmap.MADV_SEQUENTIAL)
+            self.data = np.frombuffer(self.mmap, dtype='>i2')
+        self.grid = self.data.reshape(self.sample_lat, self.sample_lng)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.data = None
+        self.grid = None
+        self._native = None
+        if self.mmap:
+            self.mmap.close()
+            self.mmap = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def get_value_iterator(self, as_float=True):
+        return HgtValueIterator(self, as_float=as_float)
+
+    def get_sample_iterator(self, width, height, as_float=True):
+        return HgtSampleIterator(self, width, height, as_float=as_float)
+
+    @property
+    def nb_values(self):
+        """
+        :return: the total number of values in the file
+        :rtype: int
+        """
+        return self.sample_lat * self.sample_lng
+
+    @property
+    def native_grid(self):
+        """ The value grid converted once to native byte order
+
+        The mapped grid is big-endian so every numpy operation on it swaps
+        bytes on the fly. Consumers doing repeated vectorized reads go
+        through this converted copy instead : the conversion is numpy's
+        vectorized byteswap and runs once per file.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self._native is None:
+            if self.data.dtype.isnative:
+                # cached grids are already stored in native byte order
+                self._native = self.grid
+            else:
+                self._native = self.data.astype(np.int16).reshape(self.sample_lat, self.sample_lng)
+        return self._native
+
+    def _get_top_left_square(self):
+        """ Get the corners of the top left square in the HGT file
+
+         .. note:: useful when iterating over all the values
+
+        :return: tuple of 4 position tuples (bottom left, top left, top right, bottom right) with (lat, lng) for each
+        position as float
+        :rtype: ((float, float), (float, float), (float, float), (float, float))
+        """
+        return (
+            (self.corners[1][0] - self.square_height, self.corners[1][1]),
+            self.corners[1],
+            (self.corners[1][0], self.corners[1][1] + self.square_width),
+            (self.corners[1][0] - self.square_height, self.corners[1][1] + self.square_width)
+        )
+
+    def get_square_corners(self, line, col):
+        """ Get the 4 corner positions of a square knowing the line number and the column
+
+        :param int line: the line of the square
+        :param int col: the column of the square
+        :return: tuple of 4 position tuples (bottom left, top left, top right, bottom right) with (lat, lng) for each
+        position as float
+        :rtype: ((float, float), (float, float), (float, float), (float, float))
+        """
+        return (
+            # bottom left corner
+            (self.top_left_square[0][0] - line * self.square_height,
+             self.top_left_square[0][1] + col * self.square_width),
+            # top left corner
+            (self.top_left_square[1][0] - line * self.square_height,
+             self.top_left_square[1][1] + col * self.square_width),
+            # top right corner
+            (self.top_left_square[2][0] - line * self.square_height,
+             self.top_left_square[2][1] + col * self.square_width),
+            # bottom right corner
+            (self.top_left_square[3][0] - line * self.square_height,
+             self.top_left_square[3][1] + col * self.square_width)
+        )
+
+    def shift_first_square(self, line, col):
+        """ Shift the top left square by the provided number of lines and columns
+
+        :param int line: line number (from 0 to sample_lat - 1)
+        :param int col: column number (from 0 to sample_lng - 1)
+        :return: tuple of 4 position tuples (bottom left, top left, top right, bottom right) with (lat, lng) for each
+        position as float
+        :rtype: ((float, float), (float, float), (float, float), (float, float))
+        """
+        if not 0 <= line < self.sample_lat or not 0 <= col < self.sample_lng:
+            raise Exception('Out of bound line or col')
+
+        lats = self._corner_lats[:, line]
+        lngs = self._corner_lngs[:, col]
+        return ((lats[0], lngs[0]), (lats[1], lngs[1]), (lats[2], lngs[2]), (lats[3], lngs[3]))
+
+    def get_all_squares(self):
+        """ Get the corner positions of all the squares in the file at once
+
+        .. note:: the returned arrays are broadcast views over the precomputed
+            corner lattices so no per-square allocation happens
+
+        :return: tuple of 4 corner tuples (bottom left, top left, top right, bottom right) with
+        (lat, lng) arrays of shape (sample_lat, sample_lng) for each corner
+        :rtype: ((ndarray, ndarray), (ndarray, ndarray), (ndarray, ndarray), (ndarray, ndarray))
+        """
+        shape = (self.sample_lat, self.sample_lng)
+        squares = ()
+        for corner_idx in range(4):
+            squares += ((np.broadcast_to(self._corner_lats[corner_idx][:, np.newaxis], shape),
+                         np.broadcast_to(self._corner_lngs[corner_idx][np.newaxis, :], shape)),)
+        return squares
+
+    @staticmethod
+    def _get_bottom_left_center(filename):
+        """ Extract the latitude and longitude of the center of the bottom left elevation
+        square based on the filename
+
+        :param str filename: name of the HGT file
+        :return: tuple (latitude of the center of the bottom left square, longitude of the bottom left square)
+        :rtype: tuple of float
+        :raises Exception: if filename does not match an expected HGT file pattern
+        """
+        result = _FILENAME_RE.match(filename)
+        if not result:
+            raise Exception('file {} does not match expected HGT file pattern'.format(filename))
+
+        lat_order, lat_left_bottom_center, lng_order, lng_left_bottom_center = result.groups()
+
+        lat_left_bottom_center = fractions.Fraction(int(lat_left_bottom_center), 1)
+        lng_left_bottom_center = fractions.Fraction(int(lng_left_bottom_center), 1)
+        if lat_order == 'S':
+            lat_left_bottom_center *= -1
+        if lng_order == 'W':
+            lng_left_bottom_center *= -1
+
+        return lat_left_bottom_center, lng_left_bottom_center
+
+    def _get_corners_from_filename(self, bottom_left_corner):
+        """ Based on the bottom left center latitude and longitude get the latitude and longitude of all the corner
+         covered by the parsed HGT file
+
+        :param tuple bottom_left_corner: position of the bottom left corner (lat, lng)
+        :return: tuple of 4 position tuples (bottom left, top left, top right, bottom right) with (lat, lng) for each
+        position as float
+        :rtype: ((float, float), (float, float), (float, float), (float, float))
+        """
+        bottom_left = (bottom_left_corner[0] - self.square_height / 2, bottom_left_corner[1] - self.square_width / 2)
+        top_left = (bottom_left[0] + self.area_height, bottom_left[1])
+        top_right = (top_left[0], top_left[1] + self.area_width)
+        bottom_right = (bottom_left[0], bottom_left[1] + self.area_width)
+
+        return bottom_left, top_left, top_right, bottom_right
+
+    def is_inside(self, point):
+        """ Check if the point is inside the parsed HGT file
+
+        :param tuple point: (lat, lng) of the point
+        :return: True if the point is inside else False
+        :rtype: bool
+        """
+        return \
+            self.corners[0][0] < point[0] \
+            and self.corners[0][1] < point[1] \
+            and point[0] < self.corners[2][0] \
+            and point[1] < self.corners[2][1]
+
+    def get_idx(self, col, line):
+        """ Calculate the index of the value based on the column and line numbers of the value
+
+        :param int col: the column number (zero based)
+        :param int line: the line number (zero based)
+        :return: the index of the value
+        :rtype: int
+        :raises Exception: if the col and line are outside the file
+        """
+        if not 0 <= line < self.sample_lat or not 0 <= col < self.sample_lng:
+            raise Exception('Out of bound line or col')
+
+        return line * self.sample_lng + col
+
+    def get_value(self, idx):
+        """ Get the elevation value at the provided index
+
+        :param int idx: index of the value
+        :return: the elevation value
+        :rtype: int
+        """
+        return int(self.data[idx])
+
+    def get_idx_in_file(self, pos):
+        """ From a position (lat, lng) as float. Get the index of the elevation value inside the HGT file
+
+        :param tuple pos: (lat, lng) of the position
+        :return: tuple (index on the latitude from the top, index on the longitude from the left, index in the file)
+        :rtype: (int, int, int)
+        :raises Exception: if the point could not be found in the parsed HGT file
+        """
+        lat_idx = (self.sample_lat - 1) - int(round((pos[0] - self.bottom_left_center[0]) / self.square_height))
+        lng_idx = int(round((pos[1] - self.bottom_left_center[1]) / self.square_width))
+
+        # checking the computed indices replaces the 4 float compares of a
+        # separate is_inside pass
+        if not 0 <= lat_idx < self.sample_lat or not 0 <= lng_idx < self.sample_lng:
+            raise Exception('point {} is not inside HGT file {}'.format(pos, self.filename))
+
+        idx = lat_idx * self.sample_lng + lng_idx
+        return lat_idx, lng_idx, idx
+
+    def get_elevation(self, pos):
+        """ Get the elevation for a position
+
+        :param tuple pos: (lat, lng) of the position
+        :return: tuple (index on the latitude from the top, index on the longitude from the left, elevation in meters)
+        :rtype: (int, int, int)
+        :raises Exception: if the point could not be found in the parsed HGT file
+        """
+        lat_idx, lng_idx, idx = self.get_idx_in_file(pos)
+
+        # If no elevation returns None
+        value = self.get_value(idx)
+        value = value if value != self.VOID_VALUE else None
+
+        return lat_idx, lng_idx, value
+
+    def get_elevations(self, points):
+        """ Get the elevation of a batch of positions at once
+
+        Vectorized version of :func:`gmaltcli.hgt.HgtParser.get_elevation` :
+        the positions are converted to grid indices and gathered from the
+        value array with numpy operations only
+
+        :param points: (lat, lng) positions as an array of shape (N, 2)
+        :type points: :class:`numpy.ndarray`
+        :return: tuple of 3 arrays of shape (N,) (index on the latitude from the top,
+            index on the longitude from the left, elevation in meters as float with
+            `numpy.nan` where the file holds no value)
+        :rtype: (ndarray, ndarray, ndarray)
+        :raises Exception: if one of the points could not be found in the parsed HGT file
+        """
+        points = np.asarray(points, dtype=np.float64)
+
+        lat_idx = (self.sample_lat - 1) - \
+            np.rint((points[:, 0] - float(self.bottom_left_center[0])) / float(self.square_height)).astype(np.intp)
+        lng_idx = np.rint((points[:, 1] - float(self.bottom_left_center[1])) / float(self.square_width)).astype(np.intp)
+
+        inside = (0 <= lat_idx) & (lat_idx < self.sample_lat) & (0 <= lng_idx) & (lng_idx < self.sample_lng)
+        if not inside.all():
+            outside = points[~inside][0]
+            raise Exception('point ({}, {}) is not inside HGT file {}'.format(outside[0], outside[1], self.filename))
+
+        values = self.native_grid[lat_idx, lng_idx].astype(np.float64)
+        values[values == self.VOID_VALUE] = np.nan
+        return lat_idx, lng_idx, values
+
+
+class HgtBaseIterator(object):
+    """ Base iterator to share methods
+
+    :param bool as_float: if True returns square cornes as float else as :class:`fractions.Fraction`
+    """
+    def __init__(self, as_float=True):
+        self.as_float = as_float
+
+    def to_float(self, value):
+        """ Convert a :class:`fractions.Fraction` to a float if `as_float` is True
+
+        :param value: the fraction to convert
+        :type value: :class:`fractions.Fraction`
+        :return: the converted value
+        :rtype: :class:`fractions.Fraction` or float
+        """
+        return float(value) if self.as_float else value
+
+    def format_corners(self, corners):
+        """ Convert the 4 corner positions in a single expression instead of
+        growing a tuple corner by corner
+
+        :param corners: tuple of 4 (lat, lng) position tuples
+        :return: the same corners converted by `to_float`
+        """
+        return ((self.to_float(corners[0][0]), self.to_float(corners[0][1])),
+                (self.to_float(corners[1][0]), self.to_float(corners[1][1])),
+                (self.to_float(corners[2][0]), self.to_float(corners[2][1])),
+                (self.to_float(corners[3][0]), self.to_float(corners[3][1])))
+
+
+class HgtValueIterator(HgtBaseIterator):
+    """ Iterator over all the elevation values in the file
+
+    :param parser: a HgtParser instance
+    :type parser: :class:`gmaltcli.hgt.HgtParser`
+    :param bool as_float: if True converts fraction to float
+    :return: tuple with (zero based line number, zero based column number, zero based index,
+    square corners of the elevation value, elevation value)
+    :rtype: (int, int, int, ((float, float), (float, float), (float, float), (float, float)), int)
+    """
+    def __init__(self, parser, as_float=True):
+        super(HgtValueIterator, self).__init__(as_float=as_float)
+        self.parser = parser
+
+    @property
+    def nb_values(self):
+        """
+        :return: the total number of values returned contained the iterable
+        :rtype: int
+        """
+        return self.parser.nb_values
+
+    def __iter__(self):
+        if self.as_float:
+            return self._iter_float()
+        return self._iter_exact()
+
+    def _iter_float(self):
+        """ Yield all the values of the file line per line with square corners as float
+
+        The corner positions and the elevation values of a whole line are
+        pulled from the parser arrays in bulk so the inner loop only has to
+        build the yielded tuples
+        """
+        bl_lats, tl_lats, tr_lats, br_lats = [lats.tolist() for lats in self.parser._corner_lats]
+        bl_lngs, tl_lngs, tr_lngs, br_lngs = [lngs.tolist() for lngs in self.parser._corner_lngs]
+
+        idx = 0
+        for line in range(self.parser.sample_lat):
+            values = self.parser.grid[line].tolist()
+            bl_lat, tl_lat, tr_lat, br_lat = bl_lats[line], tl_lats[line], tr_lats[line], br_lats[line]
+            for col, value in enumerate(values):
+                square = ((bl_lat, bl_lngs[col]), (tl_lat, tl_lngs[col]),
+                          (tr_lat, tr_lngs[col]), (br_lat, br_lngs[col]))
+                yield line, col, idx, square, value
+                idx += 1
+
+    def _iter_exact(self):
+        """ Yield all the values of the file line per line with square corners
+        as exact :class:`fractions.Fraction`
+
+        Slower path used when `as_float` is False : the corners are computed
+        with the fraction arithmetic of get_square_corners for every cell
+        """
+        idx = 0
+        for line in range(self.parser.sample_lat):
+            values = self.parser.grid[line].tolist()
+            for col, value in enumerate(values):
+                yield line, col, idx, self.parser.get_square_corners(line, col), value
+                idx += 1
+
+
+class HgtSampleIterator(HgtBaseIterator):
+    """ Iterator over samples. For example 50x50 values per 50x50
+
+    :param parser: a HgtParser instance
+    :type parser: :class:`gmaltcli.hgt.HgtParser`
+    :param int width: width of the sample area
+    :param int height: height of the sample area
+    :param bool as_float: if True converts fraction to float
+    :return: tuple with (zero based line number of top left corner, zero based column number of top left corner,
+    zero based index of top left corner, square corners position, list of all elevation values in square line per line)
+    :rtype: (int, int, int, ((float, float), (float, float), (float, float), (float, float)), int[][)
+    """
+    def __init__(self, parser, width, height, as_float=True):
+        super(HgtSampleIterator, self).__init__(as_float=as_float)
+        self.parser = parser
+        self.width = width
+        self.height = height
+        self.range_line = range(0, self.parser.sample_lat, self.height)
+        self.range_col = range(0, self.parser.sample_lng, self.width)
+
+    @property
+    def nb_values(self):
+        """
+        :return: the total number of values returned contained the iterable
+        :rtype: int
+        """
+        return len(self.range_line) * len(self.range_col)
+
+    def __iter__(self):
+        """ Yield all the samples of the file line of samples per line of samples """
+        for top_left_line_idx in self.range_line:
+            for top_left_col_idx in self.range_col:
+                yield self._get_sample(top_left_col_idx, top_left_line_idx)
+
+    def _get_sample(self, top_left_col_idx, top_left_line_idx):
+        """ Build the sample whose top left corner is at the provided column and line numbers
+
+        :param int top_left_col_idx: column number of the top left corner of the sample
+        :param int top_left_line_idx: line number of the top left corner of the sample
+        :return: same model as the iterator itself
+        :rtype: (int, int, int, ((float, float), (float, float), (float, float), (float, float)), int[][)
+        """
+        values = self._get_square_values(top_left_col_idx, top_left_line_idx)
+        # Get all corners of the samples square area
+        top_left_square_corners = self.parser.get_square_corners(top_left_line_idx, top_left_col_idx)
+        top_left_corner = top_left_square_corners[1]
+        square_corners = (
+            # bottom left
+            (top_left_corner[0] - len(values) * self.parser.square_height, top_left_corner[1]),
+            # top left
+            top_left_corner,
+            # top right
+            (top_left_corner[0], top_left_corner[1] + len(values[0]) * self.parser.square_width),
+            # bottom right
+            (top_left_corner[0] - len(values) * self.parser.square_height,
+             top_left_corner[1] + len(values[0]) * self.parser.square_width)
+        )
+
+        # Return same model as HgtValueIterator with square width and height
+        return (
+            top_left_line_idx,
+            top_left_col_idx,
+            self.parser.get_idx(top_left_col_idx, top_left_line_idx),
+            self.format_corners(square_corners),
+            values
+        )
+
+    def _get_square_values(self, top_left_col_idx, top_left_line_idx):
+        """ Get all the elevation values in the requested square knowing
+        its top left corner line and column numbers
+
+        :param int top_left_col_idx: column number of the top left corner of the requested square
+        :param int top_left_line_idx: line number of the top left corner of the requested square
+        :return: list of list of elevation values (grouped per line)
+        :rtype: list[list[int]]
+        """
+        block = self.parser.grid[top_left_line_idx:top_left_line_idx + self.height,
+                                 top_left_col_idx:top_left_col_idx + self.width]
+        return block.tolist()
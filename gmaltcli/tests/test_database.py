@@ -155,6 +155,29 @@ def test_postgres_value_manager_prepare_params():
     assert return_value == {'lat_max': 15, 'lat_min': 2, 'lng_max': 12, 'lng_min': 6, 'value': 456}
 
 
+def test_postgres_value_manager_insert_many(monkeypatch):
+    mock_parser = type('test', (object,), {})()
+    mock_parser.VOID_VALUE = -32768
+
+    execute_many_mock = tools.MockCallable()
+
+    def mockreturn(*args, **kwargs):
+        return execute_many_mock(*args, **kwargs)
+    monkeypatch.setattr(database.PostgresValueManager, 'execute_many', mockreturn)
+
+    manager = database.PostgresValueManager('connection', 'table_name')
+    manager.insert_many([
+        ('notused1', 'notused2', 'notused2', [(2, 9), (5, 12), (8, 6), (15, 11)], 456),
+        ('notused1', 'notused2', 'notused2', [(2, 9), (5, 12), (8, 6), (15, 11)], -32768),
+        ('notused1', 'notused2', 'notused2', [(3, 9), (6, 12), (9, 6), (16, 11)], 457),
+    ], mock_parser)
+
+    assert execute_many_mock.called is True
+    assert execute_many_mock.args[1] == database.PostgresValueManager.VALUE_CREATE_MANY_QUERY
+    # the void value is filtered out of the batch
+    assert [params['value'] for params in execute_many_mock.args[2]] == [456, 457]
+
+
 def test_postgres_raster_manager_prepare_params():
     mock_parser = type('test', (object,), {})()
     mock_parser.square_width = 5.6
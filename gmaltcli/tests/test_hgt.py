@@ -0,0 +1,247 @@
+import fractions
+import os
+
+import pytest
+
+import gmaltcli.hgt as hgt
+
+
+def fixture_path(*parts):
+    return os.path.realpath(os.path.join(os.path.dirname(__file__), *parts))
+
+
+SRTM3_FILE = fixture_path('srtm3', 'N00E010.hgt')
+SRTM1_FILE = fixture_path('srtm1', 'N00E010.hgt')
+IMPORT_FILE = fixture_path('import', 'N02E010.hgt')
+
+
+class TestGridCache(object):
+    def test_get_and_put(self):
+        cache = hgt._GridCache(maxsize=2)
+        assert cache.get('N00E010.hgt') is None
+
+        cache.put('N00E010.hgt', 'grid1')
+        assert cache.get('N00E010.hgt') == 'grid1'
+
+    def test_least_recently_used_eviction(self):
+        cache = hgt._GridCache(maxsize=2)
+        cache.put('N00E010.hgt', 'grid1')
+        cache.put('N00E011.hgt', 'grid2')
+
+        # refresh grid1 so grid2 is the eviction candidate
+        cache.get('N00E010.hgt')
+        cache.put('N00E012.hgt', 'grid3')
+
+        assert cache.get('N00E010.hgt') == 'grid1'
+        assert cache.get('N00E011.hgt') is None
+        assert cache.get('N00E012.hgt') == 'grid3'
+
+    def test_clear(self):
+        cache = hgt._GridCache(maxsize=2)
+        cache.put('N00E010.hgt', 'grid1')
+        cache.clear()
+        assert cache.get('N00E010.hgt') is None
+
+
+class TestHgtParser(object):
+    def test__init__file_not_found(self):
+        with pytest.raises(Exception) as e:
+            hgt.HgtParser('/unknown/folder/N00E010.hgt')
+        assert str(e.value) == 'file /unknown/folder/N00E010.hgt not found'
+
+    def test__init__(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        assert parser.filename == 'N00E010.hgt'
+        assert parser.sample_lat == 1201
+        assert parser.sample_lng == 1201
+        assert parser.nb_values == 1442401
+        assert float(parser.square_width) == pytest.approx(1.0 / 1200)
+        assert float(parser.square_height) == pytest.approx(1.0 / 1200)
+        assert parser.bottom_left_center == (0, 10)
+
+    def test__init__custom_sampling(self):
+        parser = hgt.HgtParser(IMPORT_FILE, 50, 50)
+        assert parser.sample_lat == 50
+        assert parser.sample_lng == 50
+        assert parser.nb_values == 2500
+
+    def test__get_bottom_left_center(self):
+        assert hgt.HgtParser._get_bottom_left_center('N00E010.hgt') == (0, 10)
+        assert hgt.HgtParser._get_bottom_left_center('S14W077.hgt') == (-14, -77)
+        with pytest.raises(Exception) as e:
+            hgt.HgtParser._get_bottom_left_center('invalid.hgt')
+        assert str(e.value) == 'file invalid.hgt does not match expected HGT file pattern'
+
+    def test_corners(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        half_square = 1.0 / 2400
+        assert float(parser.corners[0][0]) == pytest.approx(0 - half_square)
+        assert float(parser.corners[0][1]) == pytest.approx(10 - half_square)
+        assert float(parser.corners[2][0]) == pytest.approx(1 + half_square)
+        assert float(parser.corners[2][1]) == pytest.approx(11 + half_square)
+
+    def test_is_inside(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        assert parser.is_inside((0.5, 10.5))
+        assert parser.is_inside((0.0, 10.0))
+        assert not parser.is_inside((1.5, 10.5))
+        assert not parser.is_inside((0.5, 9.5))
+
+    def test_get_idx(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        assert parser.get_idx(0, 0) == 0
+        assert parser.get_idx(10, 2) == 2412
+        with pytest.raises(Exception) as e:
+            parser.get_idx(1201, 0)
+        assert str(e.value) == 'Out of bound line or col'
+
+    def test_get_idx_in_file(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            assert parser.get_idx_in_file((1.0001, 10.0001)) == (0, 0, 0)
+            assert parser.get_idx_in_file((0.861295, 10.339703)) == (166, 408, 199774)
+            with pytest.raises(Exception) as e:
+                parser.get_idx_in_file((2.0, 10.5))
+            assert str(e.value) == 'point (2.0, 10.5) is not inside HGT file N00E010.hgt'
+
+    def test_get_elevation_srtm3(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            assert parser.get_elevation((1.0001, 10.0001)) == (0, 0, 57)
+            assert parser.get_elevation((0.861295, 10.339703)) == (166, 408, 644)
+
+    def test_get_elevation_srtm1(self):
+        with hgt.HgtParser(SRTM1_FILE) as parser:
+            assert parser.get_elevation((1.0001, 10.0001)) == (0, 0, 57)
+            assert parser.get_elevation((0.861295, 10.339703)) == (499, 1223, 646)
+
+    def test_get_elevations(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            lat_idx, lng_idx, values = parser.get_elevations([(1.0001, 10.0001), (0.861295, 10.339703)])
+            assert lat_idx.tolist() == [0, 166]
+            assert lng_idx.tolist() == [0, 408]
+            assert values.tolist() == [57, 644]
+
+    def test_get_elevations_outside(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            with pytest.raises(Exception) as e:
+                parser.get_elevations([(0.861295, 10.339703), (2.0, 10.5)])
+            assert str(e.value) == 'point (2.0, 10.5) is not inside HGT file N00E010.hgt'
+
+    def test_get_value(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            assert parser.get_value(0) == 57
+            assert parser.get_value(199774) == 644
+
+    def test_native_grid(self):
+        with hgt.HgtParser(SRTM3_FILE) as parser:
+            assert parser.native_grid.dtype.isnative
+            assert parser.native_grid is parser.native_grid
+            assert (parser.native_grid == parser.grid).all()
+
+    def test_shift_first_square(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        square = parser.shift_first_square(0, 0)
+        for corner, expected in zip(square, parser.top_left_square):
+            assert corner[0] == pytest.approx(float(expected[0]))
+            assert corner[1] == pytest.approx(float(expected[1]))
+        square = parser.shift_first_square(1, 2)
+        assert float(square[1][0]) == pytest.approx(float(parser.top_left_square[1][0]) - 1.0 / 1200)
+        assert float(square[1][1]) == pytest.approx(float(parser.top_left_square[1][1]) + 2.0 / 1200)
+        with pytest.raises(Exception) as e:
+            parser.shift_first_square(1201, 0)
+        assert str(e.value) == 'Out of bound line or col'
+
+    def test_use_cache(self):
+        hgt.grid_cache.clear()
+        try:
+            with hgt.HgtParser(SRTM3_FILE, use_cache=True) as parser:
+                assert parser.file is None
+                assert parser.get_elevation((0.861295, 10.339703)) == (166, 408, 644)
+            assert hgt.grid_cache.get(SRTM3_FILE) is not None
+
+            # second parse reads from the cache
+            with hgt.HgtParser(SRTM3_FILE, use_cache=True) as parser:
+                assert parser.data is hgt.grid_cache.get(SRTM3_FILE)
+                assert parser.get_elevation((0.861295, 10.339703)) == (166, 408, 644)
+        finally:
+            hgt.grid_cache.clear()
+
+    def test_get_all_squares(self):
+        parser = hgt.HgtParser(SRTM3_FILE)
+        squares = parser.get_all_squares()
+        assert len(squares) == 4
+        for corner_lats, corner_lngs in squares:
+            assert corner_lats.shape == (1201, 1201)
+            assert corner_lngs.shape == (1201, 1201)
+
+        shifted = parser.shift_first_square(1, 2)
+        for corner_idx in range(4):
+            assert squares[corner_idx][0][1, 2] == pytest.approx(shifted[corner_idx][0])
+            assert squares[corner_idx][1][1, 2] == pytest.approx(shifted[corner_idx][1])
+
+
+class TestHgtValueIterator(object):
+    def test_iterate(self):
+        with hgt.HgtParser(IMPORT_FILE, 50, 50) as parser:
+            values = list(parser.get_value_iterator())
+
+        assert len(values) == 2500
+        line, col, idx, square, value = values[0]
+        assert (line, col, idx) == (0, 0, 0)
+        assert len(square) == 4
+        assert square[1][0] == pytest.approx(3.0 + 1.0 / 98)
+        assert square[1][1] == pytest.approx(10.0 - 1.0 / 98)
+
+        line, col, idx, square, value = values[52]
+        assert (line, col, idx) == (1, 2, 52)
+
+    def test_iterate_as_fraction(self):
+        with hgt.HgtParser(IMPORT_FILE, 50, 50) as parser:
+            iterator = iter(parser.get_value_iterator(as_float=False))
+            line, col, idx, square, value = next(iterator)
+
+        assert (line, col, idx) == (0, 0, 0)
+        assert square == parser.top_left_square
+        assert all([isinstance(corner[0], fractions.Fraction) for corner in square])
+        assert square[1][0] == fractions.Fraction(3) + fractions.Fraction(1, 98)
+        assert square[1][1] == fractions.Fraction(10) - fractions.Fraction(1, 98)
+
+    def test_nb_values(self):
+        parser = hgt.HgtParser(IMPORT_FILE, 50, 50)
+        assert parser.get_value_iterator().nb_values == 2500
+
+
+class TestHgtSampleIterator(object):
+    def test_iterate(self):
+        with hgt.HgtParser(IMPORT_FILE, 50, 50) as parser:
+            samples = list(parser.get_sample_iterator(12, 11))
+
+        assert len(samples) == 25
+        line, col, idx, square, values = samples[0]
+        assert (line, col, idx) == (0, 0, 0)
+        assert len(values) == 11
+        assert all([len(line_values) == 12 for line_values in values])
+
+        # last sample of a line is truncated to the file width
+        line, col, idx, square, values = samples[4]
+        assert (line, col) == (0, 48)
+        assert all([len(line_values) == 2 for line_values in values])
+
+        # last sample of the file is truncated in both directions
+        line, col, idx, square, values = samples[24]
+        assert (line, col) == (44, 48)
+        assert len(values) == 6
+        assert all([len(line_values) == 2 for line_values in values])
+
+    def test_iterate_values(self):
+        with hgt.HgtParser(IMPORT_FILE, 50, 50) as parser:
+            samples = list(parser.get_sample_iterator(50, 50))
+
+        assert len(samples) == 1
+        values = samples[0][4]
+        with hgt.HgtParser(IMPORT_FILE, 50, 50) as parser:
+            assert [value[4] for value in parser.get_value_iterator()] == \
+                   [value for line_values in values for value in line_values]
+
+    def test_nb_values(self):
+        parser = hgt.HgtParser(IMPORT_FILE, 50, 50)
+        assert parser.get_sample_iterator(12, 11).nb_values == 25
@@ -69,13 +69,13 @@ def test_download_hgt_zip_files(monkeypatch):
 
 def test_extract_hgt_zip_files(monkeypatch, custom_zip_path):
     mock_worker = mock.Mock()
-    monkeypatch.setattr(worker, 'WorkerPool', mock_worker)
+    monkeypatch.setattr(worker, 'ProcessWorkerPool', mock_worker)
 
     # If skip, function exists immediately (mock not used)
     tools.extract_hgt_zip_files(custom_zip_path, 3, skip=True)
     assert mock_worker.call_count == 0
 
-    # validate calls done on worker.WorkerPool
+    # validate calls done on worker.ProcessWorkerPool
     tools.extract_hgt_zip_files(custom_zip_path, 3, skip=False)
     mock_worker.assert_has_calls([
         mock.call(worker.ExtractWorker, 3, custom_zip_path),
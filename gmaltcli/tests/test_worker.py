@@ -79,6 +79,33 @@ class ErrorWorker(FalseWorker):
             super(ErrorWorker, self).process(queue_item, counter_info)
 
 
+class NoopWorker(worker.Worker):
+    def process(self, queue_item, counter_info):
+        pass
+
+
+class NoopErrorWorker(worker.Worker):
+    def process(self, queue_item, counter_info):
+        if counter_info[0] == 80:
+            raise Exception('Exception on 80th item')
+
+
+class TestProcessWorkerPool(object):
+    def test_start(self):
+        pool = worker.ProcessWorkerPool(NoopWorker, 5)
+        pool.fill(['item' + str(item) for item in range(1, 100)])
+        pool.start()
+
+        assert pool.counter.get() == 99
+        assert not pool.stop_event.is_set()
+
+    def test_start_and_error(self):
+        pool = worker.ProcessWorkerPool(NoopErrorWorker, 5)
+        pool.fill(['item' + str(item) for item in range(1, 100)])
+        with pytest.raises(worker.WorkerPoolException):
+            pool.start()
+
+
 class TestWorkerPool(object):
     def setup_method(self, func_method):
         self.processed = {}
@@ -262,6 +289,48 @@ class TestDownloadWorker(object):
                 'dfb52a9b9eae6de945bd2cfbbacdbc7f')
 
 
+class TestImportWorker(object):
+    class FakeIterator(object):
+        def __init__(self, nb_values):
+            self.parser = 'parser'
+            self.nb_values = nb_values
+
+        def __iter__(self):
+            return iter(range(self.nb_values))
+
+    class FakeManager(object):
+        def __init__(self):
+            self.batches = []
+
+        def insert_many(self, batch, parser):
+            self.batches.append(list(batch))
+
+    def setup_method(self, func_method):
+        stop_event = threading.Event()
+        counter = worker.SafeCounter()
+        worker_queue = queue.Queue()
+        self.import_worker = worker.ImportWorker(1, worker_queue, counter, stop_event,
+                                                 None, None, False, (None, None))
+
+    def test__execute_import_batches(self, monkeypatch):
+        monkeypatch.setattr(worker.ImportWorker, 'BATCH_SIZE', 10)
+        manager = self.FakeManager()
+
+        self.import_worker._execute_import(self.FakeIterator(25), manager)
+
+        assert [len(batch) for batch in manager.batches] == [10, 10, 5]
+        assert [value for batch in manager.batches for value in batch] == list(range(25))
+
+    def test__execute_import_stopped(self, monkeypatch):
+        monkeypatch.setattr(worker.ImportWorker, 'BATCH_SIZE', 10)
+        manager = self.FakeManager()
+
+        self.import_worker.stop_event.set()
+        self.import_worker._execute_import(self.FakeIterator(25), manager)
+
+        assert manager.batches == []
+
+
 class TestExtractWorker(object):
     def setup_method(self, func_method):
         stop_event = threading.Event()
@@ -96,7 +96,8 @@ def extract_hgt_zip_files(working_dir, concurrency, skip=False):
     zip_files = [os.path.realpath(filename) for filename in glob.glob(os.path.join(working_dir, "*.zip"))]
     logging.info('Nb of files to extract : {}'.format(len(zip_files)))
     logging.debug('Extract start')
-    extract_task = worker.WorkerPool(worker.ExtractWorker, concurrency, working_dir)
+    # decompression is CPU bound so the workers run in processes
+    extract_task = worker.ProcessWorkerPool(worker.ExtractWorker, concurrency, working_dir)
     extract_task.fill(zip_files)
     extract_task.start()
     logging.debug('Extract end')
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
 import threading
+import multiprocessing
 import logging
 import time
 import zipfile
 import hashlib
+import mmap
 
 try:
     # Python 3
@@ -23,7 +25,7 @@ except NameError:
     # Python 3
     xrange = range
 
-import gmalthgtparser as hgt
+import gmaltcli.hgt as hgt
 
 
 class SafeCounter(object):
@@ -52,6 +54,32 @@ class SafeCounter(object):
         return '%d/%d' % (self.counter, self.max)
 
 
+class ProcessSafeCounter(object):
+    """ A counter shared between processes.
+
+    .. note:: same contract as :class:`gmaltcli.worker.SafeCounter` but backed
+        by a :class:`multiprocessing.Value`
+    """
+    def __init__(self, start=0, max_=0, incr=1):
+        self.counter = multiprocessing.Value('i', start)
+        self.max = max_
+        self.incr = incr
+
+    def increment(self):
+        """ Increment the counter """
+        with self.counter.get_lock():
+            self.counter.value += self.incr
+            next_counter = self.counter.value
+        return next_counter, self.max
+
+    def get(self):
+        """ Get the counter current value """
+        return self.counter.value
+
+    def __str__(self):
+        return '%d/%d' % (self.counter.value, self.max)
+
+
 class WorkerPoolException(Exception):
     """ Exception raised by :class:`gmaltcli.worker.WorkerPool` when one of its
     thread has raised an exception
@@ -98,7 +126,7 @@ class WorkerPool(object):
         .. note:: Used instead of the threading `join` method in order to allow
             the main thread to watch for event like `KeyboardInterrupt`
         """
-        while any([worker.isAlive() for worker in self.workers]):
+        while any([worker.is_alive() for worker in self.workers]):
             time.sleep(0.1)
 
     def start(self):
@@ -123,6 +151,37 @@ class WorkerPool(object):
             raise WorkerPoolException()
 
 
+def _run_worker(worker_class, id_, queue_obj, counter, stop_event, args, kwargs):
+    """ Entry point of a :class:`gmaltcli.worker.ProcessWorkerPool` child process :
+    build the worker in the child and run it
+    """
+    # noinspection PyCallingNonCallable
+    worker_class(id_, queue_obj, counter, stop_event, *args, **kwargs).run()
+
+
+class ProcessWorkerPool(WorkerPool):
+    """ Same as :class:`gmaltcli.worker.WorkerPool` but runs its workers in
+    processes instead of threads
+
+    .. note:: use it for CPU bound workers which do not release the GIL. The
+        worker class and its additionnal constructor arguments must be
+        picklable since the worker is built inside the child process
+
+    :param worker: The class of the Worker thread
+    :type worker: :class:`gmaltcli.worker.Worker`
+    :param int size: number of worker to create in pool
+    """
+    def __init__(self, worker, size, *args, **kwargs):
+        self.queue = multiprocessing.JoinableQueue()
+        self.counter = ProcessSafeCounter()
+        self.stop_event = multiprocessing.Event()
+        self.workers = []
+        for i in range(size):
+            self.workers.append(multiprocessing.Process(
+                target=_run_worker,
+                args=(worker, i + 1, self.queue, self.counter, self.stop_event, args, kwargs)))
+
+
 class Worker(threading.Thread):
     """ This worker is a thread. It subscribes to a queue. On each queue item,
     it executes the `process` method.
@@ -157,24 +216,32 @@ class Worker(threading.Thread):
         """
         self._log_debug('started')
 
-        while True:
-            if self.queue.empty() or self.stop_event.is_set():
+        while not self.stop_event.is_set():
+            if not self._get_queue():
                 break
 
-            self._get_queue()
-
         self._on_end()
         self._log_debug('stopped')
 
     def _get_queue(self):
         """ Get an item from the queue and call the `process` method on it.
 
+        .. note:: blocks on the queue and gives up after a short timeout so
+            there is no window between checking the queue and consuming it
+
         .. note:: in case of an exception, it sets the `stop_event`
 
         .. note:: child class needs to implement the `process` method
+
+        :return: False if the queue was empty else True
+        :rtype: bool
         """
         try:
-            queue_item = self.queue.get()
+            queue_item = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return False
+
+        try:
             counter_info = self.counter.increment()
 
             self.process(queue_item, counter_info)
@@ -185,6 +252,8 @@ class Worker(threading.Thread):
             self._log_debug('exception raised')
             self.stop_event.set()
 
+        return True
+
     def process(self, queue_item, counter_info):
         """ Method called by `_get_queue` to process a queue_item.
         Implement it in child class
@@ -241,37 +310,39 @@ class DownloadWorker(Worker):
         self._secured_download_file(queue_item['url'], queue_item['zip'], queue_item.get('md5', None))
         self._log_debug('downloaded %s', (queue_item['url'],))
 
-    def _secured_download_file(self, url, filename, md5sum=None, attempt=1, exc_error=Exception('not defined')):
+    def _secured_download_file(self, url, filename, md5sum=None):
         """ Download a file and stores it in `folder`
 
         .. note:: the download is delegated to method :meth:`worker.DownloadWorker._download_file`.
             This method is just a wrapper to catch errors from :mod:`urllib`
+            and retry up to `max_attempt` times
 
         :param str url: the url to download
         :param str filename: the name of the file created
         :param str md5sum: the md5sum of the file to validate download
-        :param int attempt: the number of times we retried to download the file
         """
-        if attempt > self.max_attempt:
-            logging.error('Unable to download file {}. After {} attempts'.format(url, attempt - 1))
-            raise exc_error
-        if attempt > 1:
-            self._log_debug('retrying download file %s. Attempt %i', (url, attempt))
-
-        try:
-            self._download_file(url, filename, md5sum)
-        except (InvalidCheckSumException, zipfile.BadZipfile) as exc_checksum:
-            logging.error('Unable to download file {}. File not validated.'.format(url))
-            self._secured_download_file(url, filename, md5sum, attempt+1, exc_checksum)
-        except URLError as exc_url:
-            logging.error('Unable to download file {}. Verify your internet connection'.format(url))
-            self._secured_download_file(url, filename, md5sum, attempt + 1, exc_url)
-        except HTTPError as exc_http:
-            logging.error('Unable to download file {}. Verify the link.'.format(url))
-            self._secured_download_file(url, filename, md5sum, attempt + 1, exc_http)
-        except:
-            logging.error('Unable to download file {}'.format(url))
-            raise
+        last_error = None
+        for attempt in range(1, self.max_attempt + 1):
+            if attempt > 1:
+                self._log_debug('retrying download file %s. Attempt %i', (url, attempt))
+
+            try:
+                return self._download_file(url, filename, md5sum)
+            except (InvalidCheckSumException, zipfile.BadZipfile) as exc_checksum:
+                logging.error('Unable to download file {}. File not validated.'.format(url))
+                last_error = exc_checksum
+            except URLError as exc_url:
+                logging.error('Unable to download file {}. Verify your internet connection'.format(url))
+                last_error = exc_url
+            except HTTPError as exc_http:
+                logging.error('Unable to download file {}. Verify the link.'.format(url))
+                last_error = exc_http
+            except:
+                logging.error('Unable to download file {}'.format(url))
+                raise
+
+        logging.error('Unable to download file {}. After {} attempts'.format(url, self.max_attempt))
+        raise last_error
 
     def _download_file(self, url, filename, md5sum=None):
         """ Download a file and stores it in `folder`
@@ -288,14 +359,16 @@ class DownloadWorker(Worker):
 
         hgt_zip_file = urlopen(url)
         with open(file_fullpath, 'wb+') as output:
-            while True:
-                data = hgt_zip_file.read(4096)
-                if data and not self.stop_event.is_set():
-                    output.write(data)
-                else:
-                    output.flush()
-                    os.fsync(output.fileno())
+            # copy per 1MB chunk so the Python level loop runs a few dozen
+            # times per zip instead of once per 4KB, while still checking
+            # the stop event between chunks
+            while not self.stop_event.is_set():
+                data = hgt_zip_file.read(1024 * 1024)
+                if not data:
                     break
+                output.write(data)
+            output.flush()
+            os.fsync(output.fileno())
 
         self._validate_downloaded_file(file_fullpath, md5sum)
 
@@ -325,28 +398,74 @@ class DownloadWorker(Worker):
         """ Validate the md5 checksum of a file and check downloaded zip
         file CRC
 
+        .. note:: both checks read the whole file so the zip CRC pass runs
+            in a separate thread and overlaps the md5 pass
+
         :param str filepath: the absolute path of the file
         :param str md5sum: the md5 checksum it should have
         :raise InvalidCheckSumException: if the calculated md5 checksum
             does not match the one in the arguments
         :raise zipfile.BadZipfile: if the zip file CRC is not valid
         """
-        # First check md5sum
-        if md5sum:
-            with open(filepath, 'rb') as fp:
-                md5digest = hashlib.md5(fp.read()).hexdigest()
+        crc_failure = []
 
-            self._log_debug('Verifying md5 checksum for %s. Expecting %s - found %s',
-                            (filepath, md5sum, md5digest))
+        def check_zip_crc():
+            try:
+                with zipfile.ZipFile(filepath) as zip_fd:
+                    if zip_fd.testzip():
+                        raise zipfile.BadZipfile('Bad CRC on zipfile {}'.format(filepath))
+            except Exception as exception:
+                crc_failure.append(exception)
 
-            if md5sum != md5digest:
-                raise InvalidCheckSumException(
-                    'File {} md5 checksum does not match {}'.format(filepath, md5sum))
+        crc_thread = threading.Thread(target=check_zip_crc)
+        crc_thread.start()
 
-        # Then check zip file
-        with zipfile.ZipFile(filepath) as zip_fd:
-            if zip_fd.testzip():
-                raise zipfile.BadZipfile('Bad CRC on zipfile {}'.format(filepath))
+        try:
+            # md5 check raised first like when the checks were sequential
+            if md5sum:
+                md5digest = self._get_md5digest(filepath)
+
+                self._log_debug('Verifying md5 checksum for %s. Expecting %s - found %s',
+                                (filepath, md5sum, md5digest))
+
+                if md5sum != md5digest:
+                    raise InvalidCheckSumException(
+                        'File {} md5 checksum does not match {}'.format(filepath, md5sum))
+        finally:
+            crc_thread.join()
+
+        if crc_failure:
+            raise crc_failure[0]
+
+    @staticmethod
+    def _get_md5digest(filepath):
+        """ Compute the md5 digest of a file
+
+        .. note:: hashes straight from the page cache through a read-only
+            mapping of the file when possible instead of copying it into
+            userspace buffers
+
+        :param str filepath: the absolute path of the file
+        :return: the hexadecimal md5 digest of the file content
+        :rtype: str
+        """
+        md5hash = hashlib.md5()
+        with open(filepath, 'rb') as fp:
+            try:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty file or mapping not available
+                mapped = None
+
+            if mapped is not None:
+                try:
+                    md5hash.update(mapped)
+                finally:
+                    mapped.close()
+            else:
+                for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+                    md5hash.update(chunk)
+        return md5hash.hexdigest()
 
 
 class ExtractWorker(Worker):
@@ -380,13 +499,15 @@ class ExtractWorker(Worker):
         :param str filename: the name of the file to extract
         """
         with zipfile.ZipFile(filename) as zip_fd:
-            for name in zip_fd.namelist():
-                zip_fd.extract(name, self.folder)
+            zip_fd.extractall(self.folder)
 
 
 class ImportWorker(Worker):
     """ Worker in charge of reading hgt file found in `folder` and importing it """
 
+    # number of iterator values inserted per database batch
+    BATCH_SIZE = 10000
+
     def __init__(self, id_, queue_obj, counter, stop_event, folder, factory, use_raster, samples):
         super(ImportWorker, self).__init__(id_, queue_obj, counter, stop_event)
         self.folder = folder
@@ -419,7 +540,7 @@ class ImportWorker(Worker):
         """ Get the right HTML iterator for the import task
 
         :param parser: the HGT parser for the file
-        :type parser: :class:`gmalthgtparser.HgtParser`
+        :type parser: :class:`gmaltcli.hgt.HgtParser`
         :return: a HGT iterator
         :rtype: iter
         """
@@ -441,16 +562,39 @@ class ImportWorker(Worker):
         processed = 0
         last_percentage = 0
 
+        batch = []
         for value in elev_iter:
             # Break import task if an error occured in another thread or if KeyboardInterrupt
             if self.stop_event.is_set():
                 break
 
-            manager.insert_data(value, elev_iter.parser)
+            batch.append(value)
+            if len(batch) < self.BATCH_SIZE:
+                continue
+
+            manager.insert_many(batch, elev_iter.parser)
+            processed += len(batch)
+            batch = []
+
+            # Display progress as percentage once per flushed batch
+            last_percentage = self._log_progress(processed, total, last_percentage)
 
-            # Display progress as percentage
-            processed += 1
-            percents = float(processed) / total * 100
-            if int(percents) != last_percentage:
-                self._log_info("{0:.0f}% {1}/{2}".format(percents, processed, total), prefix='import')
-                last_percentage = int(percents)
+        if batch and not self.stop_event.is_set():
+            manager.insert_many(batch, elev_iter.parser)
+            processed += len(batch)
+            self._log_progress(processed, total, last_percentage)
+
+    def _log_progress(self, processed, total, last_percentage):
+        """ Log the import progress as a percentage when it changed since the last call
+
+        :param int processed: number of values imported so far
+        :param int total: total number of values provided by the iterator
+        :param int last_percentage: the last percentage logged
+        :return: the new last percentage logged
+        :rtype: int
+        """
+        percents = float(processed) / total * 100
+        if int(percents) != last_percentage:
+            self._log_info("{0:.0f}% {1}/{2}".format(percents, processed, total), prefix='import')
+            last_percentage = int(percents)
+        return last_percentage